@@ -3,6 +3,7 @@ import numpy as np
 import os
 import requests
 from collections import deque
+from functools import lru_cache
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 from stable_baselines3 import PPO
@@ -64,6 +65,8 @@ class BaseAgent:
             await asyncio.sleep(1)
 
     def receive_market_data(self, price: float):
+        if not self.running:
+            return
         self.current_price = price
         self.price_history.append(price)
         if len(self.price_history) >= self.price_history.maxlen:
@@ -164,15 +167,22 @@ class MarketMakerAgent(BaseAgent):
             return self.buy()
         else:
             return self.sell()
+
+@lru_cache(maxsize=None)
+def load_ppo_policy(path="trained_quant_agent"):
+    """Load a PPO policy once per process and share it across agents."""
+    print("[PPOAgent] Loading trained PPO policy...")
+    model = PPO.load(path)
+    print("[PPOAgent] PPO policy loaded successfully.")
+    return model
+
 class PPOAgent(BaseAgent):
     """
     Uses a trained PPO policy to decide actions.
     """
     def __init__(self, name: str, window_size=5):
         super().__init__(name, window_size)
-        print("[PPOAgent] Loading trained PPO policy...")
-        self.model = PPO.load("trained_quant_agent")
-        print("[PPOAgent] PPO policy loaded successfully.")
+        self.model = load_ppo_policy()
 
     def decide(self, features):
         obs = np.array([
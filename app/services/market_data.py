@@ -13,6 +13,10 @@ class MarketDataFeed:
     def subscribe(self, agent):
         self.subscribers.append(agent)
 
+    def unsubscribe(self, agent):
+        if agent in self.subscribers:
+            self.subscribers.remove(agent)
+
     async def run(self):
         while True:
             try:
@@ -29,7 +33,7 @@ class MarketDataFeed:
                 if price_str:
                     self.price = float(price_str)
                     print(f"[Market] Real price for {self.symbol}: {self.price:.2f}")
-                    for agent in self.subscribers:
+                    for agent in list(self.subscribers):
                         agent.receive_market_data(self.price)
                 else:
                     print("[Market] Failed to get price data, retrying...")
@@ -1,7 +1,11 @@
 from collections import deque
+from itertools import islice
 from sortedcontainers import SortedDict
+import threading
 import time
 
+MAX_TRADE_HISTORY = 5000
+
 class Order:
     def __init__(self, agent_name, side, price, quantity, timestamp=None):
         self.agent_name = agent_name
@@ -18,17 +22,24 @@ class OrderBook:
         # SortedDict: price → queue of orders (FIFO at each price level)
         self.bids = SortedDict(lambda x: -x)  # descending price
         self.asks = SortedDict()              # ascending price
-        self.trade_history = []
+        # Bounded so long-running sessions don't grow memory without limit;
+        # trade_count is the total ever recorded and acts as a cursor for readers.
+        self.trade_history = deque(maxlen=MAX_TRADE_HISTORY)
+        self.trade_count = 0
+        # Guards the book and trade history; agents place orders from feed
+        # threads while the dashboard reads depth and trades.
+        self._lock = threading.Lock()
 
     def place_order(self, order: Order):
-        if order.side == "BUY":
-            self._match_buy(order)
-            if order.quantity > 0:
-                self._add_to_book(self.bids, order)
-        else:
-            self._match_sell(order)
-            if order.quantity > 0:
-                self._add_to_book(self.asks, order)
+        with self._lock:
+            if order.side == "BUY":
+                self._match_buy(order)
+                if order.quantity > 0:
+                    self._add_to_book(self.bids, order)
+            else:
+                self._match_sell(order)
+                if order.quantity > 0:
+                    self._add_to_book(self.asks, order)
 
     def _add_to_book(self, book, order):
         if order.price not in book:
@@ -84,21 +95,33 @@ class OrderBook:
             "timestamp": time.time(),
         }
         self.trade_history.append(trade)
+        self.trade_count += 1
         print(f"[MATCH] {buy_order.agent_name} buys from {sell_order.agent_name} {quantity} @ {price:.2f}")
 
+    def trades_since(self, cursor):
+        """Return (trades recorded after cursor, new cursor)."""
+        with self._lock:
+            new_count = self.trade_count - cursor
+            if new_count <= 0:
+                return [], self.trade_count
+            start = max(len(self.trade_history) - new_count, 0)
+            return list(islice(self.trade_history, start, None)), self.trade_count
+
     def get_top_of_book(self):
-        top_bid = next(iter(self.bids)) if self.bids else None
-        top_ask = next(iter(self.asks)) if self.asks else None
+        with self._lock:
+            top_bid = next(iter(self.bids)) if self.bids else None
+            top_ask = next(iter(self.asks)) if self.asks else None
         return {"bid": top_bid, "ask": top_ask}
 
     def get_book_depth(self, levels=5):
         depth = {"bids": [], "asks": []}
-        for i, (price, orders) in enumerate(self.bids.items()):
-            if i >= levels: break
-            qty = sum(o.quantity for o in orders)
-            depth["bids"].append((price, qty))
-        for i, (price, orders) in enumerate(self.asks.items()):
-            if i >= levels: break
-            qty = sum(o.quantity for o in orders)
-            depth["asks"].append((price, qty))
+        with self._lock:
+            for i, (price, orders) in enumerate(self.bids.items()):
+                if i >= levels: break
+                qty = sum(o.quantity for o in orders)
+                depth["bids"].append((price, qty))
+            for i, (price, orders) in enumerate(self.asks.items()):
+                if i >= levels: break
+                qty = sum(o.quantity for o in orders)
+                depth["asks"].append((price, qty))
         return depth
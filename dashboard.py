@@ -4,6 +4,7 @@ import asyncio
 import threading
 import requests
 import os
+from collections import deque
 from dotenv import load_dotenv
 
 from app.models.db import SessionLocal
@@ -21,10 +22,77 @@ if not API_KEY:
     st.error("ALPHA_VANTAGE_KEY error.")
     st.stop()
 
+SYMBOL_SEARCH_TTL = 3600      # seconds to keep SYMBOL_SEARCH results
+PORTFOLIO_TTL = 300           # seconds to keep a user's portfolio symbols
+FEED_STAGGER_SECONDS = 15     # Alpha Vantage free plan rate limit
+LIVE_REFRESH_SECONDS = 2
+MAX_TRADE_ROWS = 500          # trades kept in the browser per session
+BOOK_LEVELS = 5
+
 st.set_page_config(page_title="Quant Trading Simulator", layout="wide")
 st.title("Real-Time Quant Trading Simulator")
 
-db = SessionLocal()
+
+# ---- Process-wide cached resources ----
+
+@st.cache_resource
+def get_market_feeds():
+    # One feed per symbol for the whole server, shared by every session.
+    return {}
+
+
+@st.cache_resource
+def get_feed_lock():
+    return threading.Lock()
+
+
+@st.cache_data(ttl=SYMBOL_SEARCH_TTL, show_spinner=False)
+def search_symbol(keywords):
+    response = requests.get(
+        "https://www.alphavantage.co/query",
+        params={
+            "function": "SYMBOL_SEARCH",
+            "keywords": keywords,
+            "apikey": API_KEY,
+        },
+        timeout=10,
+    )
+    # Raising keeps failed lookups out of the cache. Rate limits and API
+    # errors come back as HTTP 200 without a "bestMatches" key.
+    response.raise_for_status()
+    data = response.json()
+    if "bestMatches" not in data:
+        message = data.get("Note") or data.get("Information") or data.get("Error Message")
+        raise ValueError(message or "Unexpected SYMBOL_SEARCH response")
+    return data["bestMatches"]
+
+
+@st.cache_data(ttl=PORTFOLIO_TTL, show_spinner=False)
+def load_portfolio_symbols(user_id):
+    with SessionLocal() as db:
+        rows = db.query(Portfolio.symbol).filter_by(user_id=user_id).all()
+    return [row.symbol for row in rows]
+
+
+async def _run_feed(feed, delay):
+    await asyncio.sleep(delay)
+    await feed.run()
+
+
+def ensure_feeds(symbols):
+    feeds = get_market_feeds()
+    with get_feed_lock():
+        missing = [s for s in symbols if s not in feeds]
+        for i, symbol in enumerate(missing):
+            feed = MarketDataFeed(symbol=symbol, api_key=API_KEY)
+            feeds[symbol] = feed
+            threading.Thread(
+                target=asyncio.run,
+                args=(_run_feed(feed, i * FEED_STAGGER_SECONDS),),
+                daemon=True,
+            ).start()
+    return feeds, missing
+
 
 if "user" not in st.session_state:
     st.session_state.user = None
@@ -37,7 +105,8 @@ if st.session_state.user is None:
         username = st.text_input("Username", key="login_user")
         password = st.text_input("Password", type="password", key="login_pass")
         if st.button("Login"):
-            user = db.query(User).filter_by(username=username, hashed_password=password).first()
+            with SessionLocal() as db:
+                user = db.query(User).filter_by(username=username, hashed_password=password).first()
             if user:
                 st.session_state.user = user
                 st.success(f"Logged in as {username}")
@@ -51,37 +120,38 @@ if st.session_state.user is None:
         new_email = st.text_input("Email", key="reg_email")
         new_password = st.text_input("Password", type="password", key="reg_pass")
         if st.button("Register"):
-            existing = db.query(User).filter_by(username=new_username).first()
-            if existing:
-                st.error("Username already exists")
-            else:
-                user = User(username=new_username, email=new_email, hashed_password=new_password)
-                db.add(user)
-                db.commit()
-                st.success("Account created. Please log in.")
+            with SessionLocal() as db:
+                existing = db.query(User).filter_by(username=new_username).first()
+                if existing:
+                    st.error("Username already exists")
+                else:
+                    user = User(username=new_username, email=new_email, hashed_password=new_password)
+                    db.add(user)
+                    db.commit()
+                    st.success("Account created. Please log in.")
 else:
+    user_id = st.session_state.user.id
     st.success(f"Welcome, {st.session_state.user.username}!")
 
-   
+
     st.header("Your Portfolio")
 
-    user_portfolio = db.query(Portfolio).filter_by(user_id=st.session_state.user.id).all()
-    symbols = [p.symbol for p in user_portfolio]
+    symbols = load_portfolio_symbols(user_id)
 
-    if user_portfolio:
-        cols = st.columns(len(user_portfolio))
-        for i, stock in enumerate(user_portfolio):
+    if symbols:
+        cols = st.columns(len(symbols))
+        for i, symbol in enumerate(symbols):
             cols[i].markdown(
                 f"<div style='padding:8px 16px;border-radius:20px;"
                 f"background:linear-gradient(90deg, #a1c4fd, #c2e9fb);"
                 f"display:inline-block;font-weight:bold;color:#000;text-align:center;'>"
-                f"{stock.symbol}</div>",
+                f"{symbol}</div>",
                 unsafe_allow_html=True
             )
     else:
         st.info("Your portfolio is empty. Add stocks below!")
 
-    
+
     st.subheader("🆕 Add Stocks to Your Portfolio (with Validation)")
 
     symbol_input = st.text_input("Type company name or symbol (e.g., 'Tesla' or 'TSLA')", key="symbol_input")
@@ -90,15 +160,13 @@ else:
         if not symbol_input:
             st.warning("⚠Please enter a company name or ticker symbol.")
         else:
-            search_url = "https://www.alphavantage.co/query"
-            params = {
-                "function": "SYMBOL_SEARCH",
-                "keywords": symbol_input,
-                "apikey": API_KEY
-            }
-            response = requests.get(search_url, params=params)
-            if response.status_code == 200:
-                results = response.json().get("bestMatches", [])
+            try:
+                results = search_symbol(symbol_input.strip().upper())
+            except requests.RequestException:
+                st.error("Error calling Alpha Vantage SYMBOL_SEARCH API. Check your API key or internet connection.")
+            except ValueError as e:
+                st.error(f"Alpha Vantage SYMBOL_SEARCH failed: {e}")
+            else:
                 if results:
                     best_match = results[0]
                     validated_symbol = best_match["1. symbol"]
@@ -106,39 +174,26 @@ else:
                     region = best_match["4. region"]
                     st.success(f"Found: {validated_symbol} - {company_name} ({region})")
 
-                    existing = db.query(Portfolio).filter_by(user_id=st.session_state.user.id, symbol=validated_symbol).first()
+                    with SessionLocal() as db:
+                        existing = db.query(Portfolio).filter_by(user_id=user_id, symbol=validated_symbol).first()
+                        if not existing:
+                            db.add(Portfolio(user_id=user_id, symbol=validated_symbol))
+                            db.commit()
                     if not existing:
-                        db.add(Portfolio(user_id=st.session_state.user.id, symbol=validated_symbol))
-                        db.commit()
+                        load_portfolio_symbols.clear(user_id)
                         st.success(f"Symbol {validated_symbol} added to your portfolio!")
                         st.rerun()
                     else:
                         st.info(f"Symbol {validated_symbol} is already in your portfolio.")
                 else:
                     st.error(f"No matches found for '{symbol_input}'. Try a different name or ticker.")
-            else:
-                st.error("Error calling Alpha Vantage SYMBOL_SEARCH API. Check your API key or internet connection.")
 
-    
-    if "market_feeds" not in st.session_state:
-        st.session_state.market_feeds = {}
 
-    
-    market_feeds_copy = dict(st.session_state.market_feeds)
-
-    
-    async def start_feeds(feeds_dict):
-        for i, symbol in enumerate(symbols):
-            if symbol not in feeds_dict:
-                feed = MarketDataFeed(symbol=symbol, api_key=API_KEY)
-                feeds_dict[symbol] = feed
-                asyncio.create_task(feed.run())
-                st.success(f"Feed started for {symbol}")
-                await asyncio.sleep(15)  
+    market_feeds, started = ensure_feeds(symbols)
+    for symbol in started:
+        st.success(f"Feed started for {symbol}")
 
-    threading.Thread(target=asyncio.run, args=(start_feeds(market_feeds_copy),), daemon=True).start()
 
-    
     if "agents" not in st.session_state:
         st.session_state.agents = {}
 
@@ -170,8 +225,8 @@ else:
         if agent:
             st.session_state.agents[agent_name] = agent
             for symbol in symbols:
-                if symbol in market_feeds_copy:
-                    market_feeds_copy[symbol].subscribe(agent)
+                if symbol in market_feeds:
+                    market_feeds[symbol].subscribe(agent)
             threading.Thread(target=asyncio.run, args=(agent.run(),), daemon=True).start()
             st.sidebar.success(f"Agent '{agent_name}' started on symbols: {symbols}")
 
@@ -182,21 +237,54 @@ else:
             agent = st.session_state.agents.get(agent_to_stop)
             if agent:
                 agent.stop()
+                for feed in market_feeds.values():
+                    feed.unsubscribe(agent)
                 st.sidebar.warning(f"Agent '{agent_to_stop}' stopped.")
             else:
                 st.sidebar.error("Agent not found!")
         else:
             st.sidebar.info("No agents to stop.")
 
-    st.subheader("Live Trades")
-    trade_placeholder = st.empty()
 
-    if st.button("Refresh Trades"):
-        st.rerun()
+    if "trade_rows" not in st.session_state:
+        st.session_state.trade_rows = deque(maxlen=MAX_TRADE_ROWS)
+        st.session_state.trade_cursor = 0
+        st.session_state.trade_df = None
+        st.session_state.book_depth = None
+        st.session_state.book_dfs = None
 
-    trades = order_book.trade_history
-    if trades:
-        df = pd.DataFrame(trades)
-        trade_placeholder.dataframe(df, use_container_width=True)
-    else:
-        trade_placeholder.info("No trades yet... agents warming up!")
+    @st.fragment(run_every=LIVE_REFRESH_SECONDS)
+    def live_view():
+        state = st.session_state
+
+        # Only pull trades recorded since the last refresh.
+        new_trades, state.trade_cursor = order_book.trades_since(state.trade_cursor)
+        if new_trades:
+            state.trade_rows.extend(new_trades)
+            state.trade_df = None
+
+        st.subheader("Live Trades")
+        if state.trade_rows:
+            if state.trade_df is None:
+                state.trade_df = pd.DataFrame(reversed(state.trade_rows))
+            st.dataframe(state.trade_df, use_container_width=True)
+        else:
+            st.info("No trades yet... agents warming up!")
+
+        # Rebuild the book tables only when a level actually changed.
+        depth = order_book.get_book_depth(levels=BOOK_LEVELS)
+        if depth != state.book_depth:
+            state.book_depth = depth
+            state.book_dfs = {
+                side: pd.DataFrame(levels, columns=["price", "quantity"])
+                for side, levels in depth.items()
+            }
+
+        st.subheader("Order Book")
+        bid_col, ask_col = st.columns(2)
+        bid_col.markdown("**Bids**")
+        bid_col.dataframe(state.book_dfs["bids"], use_container_width=True, hide_index=True)
+        ask_col.markdown("**Asks**")
+        ask_col.dataframe(state.book_dfs["asks"], use_container_width=True, hide_index=True)
+
+    live_view()